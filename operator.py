@@ -1,47 +1,176 @@
+import concurrent.futures
+import functools
 import os
+import queue
+import threading
+import time
 import kopf
 import kubernetes
 import base64
 import github
+import urllib3
+from cryptography.exceptions import UnsupportedAlgorithm
 from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
 from cryptography.hazmat.backends import default_backend
 
-# Initialize the Kubernetes API client
-kubernetes.config.load_incluster_config()
-core_v1_api = kubernetes.client.CoreV1Api()
+# Kubernetes API clients are built lazily: loading the in-cluster config at
+# import time slowed cold starts and broke any import outside a pod. The
+# default connection pool holds only 4 sockets, which forces extra TLS
+# handshakes (and urllib3 "pool is full" warnings) once several handlers
+# talk to the apiserver concurrently, so the pool is widened here too.
+@functools.lru_cache(maxsize=1)
+def _api_client():
+    configuration = kubernetes.client.Configuration()
+    kubernetes.config.load_incluster_config(client_configuration=configuration)
+    configuration.connection_pool_maxsize = 50
+    # Transient apiserver blips (connection resets, brief 5xx during a
+    # control-plane rollout) should not fail a whole reconcile.
+    configuration.retries = urllib3.Retry(total=3, backoff_factor=0.2)
+    return kubernetes.client.ApiClient(configuration)
+
+@functools.lru_cache(maxsize=1)
+def _core_v1():
+    return kubernetes.client.CoreV1Api(_api_client())
+
+@functools.lru_cache(maxsize=1)
+def _custom_objects():
+    return kubernetes.client.CustomObjectsApi(_api_client())
+
+# The github-token Secret almost never changes, so re-reading it from the
+# API server on every reconcile is pure load. Cache the decoded token per
+# namespace; rotation is picked up on the next expiry, or immediately when
+# GitHub rejects the cached credentials.
+TOKEN_CACHE_TTL = float(os.environ.get('GITHUB_TOKEN_TTL', '600'))
+_TOKEN_CACHE = {}  # namespace -> (expires_at, token)
+
+def invalidate_github_token():
+    """Drop the cached token and manager, e.g. after a 401 from GitHub."""
+    global _GH_MANAGER
+    _TOKEN_CACHE.clear()
+    _GH_MANAGER = None
+
+# Many CRs can point at the same repository; sharing each repo's key list
+# for a short window means a burst of reconciles fetches it once instead
+# of once per CR.
+KEY_LIST_TTL = 60.0
+
+# The operator's own namespace never changes at runtime; resolve it once.
+CURRENT_NAMESPACE = None
+
+# Title prefix marking deploy keys as owned by this operator.
+_MANAGED_PREFIX = "k8s-operator:"
+
+# github.com host key shipped in every deploy-key Secret so consumers can
+# pin the server identity.
+KNOWN_HOSTS = "github.com ecdsa-sha2-nistp256 AAAAE2VjZHNhLXNoYTItbmlzdHAyNTYAAAAIbmlzdHAyNTYAAABBBEmKSENjQEezOmxkZMy7opKgwFB9nkt5YRrYMjNuG5N87uRgg6CLrbo5wAdT/y6v0mKV0U2w0WZ2YB/++Tpockg="
+
+# Deleting deploy keys is one independent HTTPS round-trip each; a small
+# shared pool overlaps those round-trips instead of paying N x RTT serially.
+_DELETE_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=8)
+
+# RSA-4096 generation takes seconds of CPU, so a small background pool of
+# pre-generated keypairs hides that latency behind the idle time between
+# reconciliations. The refill thread starts lazily on the first RSA request
+# so operators that only ever use Ed25519 keys pay nothing. Keypairs carry
+# no CR-specific identity, so handing out a pre-generated one is safe.
+# Clamped to at least 1: Queue(maxsize=0) means unbounded, which would
+# turn the refill threads into a runaway keygen loop.
+RSA_KEY_POOL_SIZE = max(1, int(os.environ.get('RSA_KEY_POOL_SIZE', '4')))
+# OpenSSL's keygen releases the GIL, so two refill threads regenerate the
+# pool roughly twice as fast after a burst of creates drains it.
+RSA_POOL_REFILL_WORKERS = 2
+_RSA_KEY_POOL = queue.Queue(maxsize=RSA_KEY_POOL_SIZE)
+_RSA_POOL_THREADS = []
+_RSA_POOL_LOCK = threading.Lock()
+
+def _generate_rsa_keypair(key_size=4096):
+    """Generate and serialize one RSA keypair."""
+    private_key = rsa.generate_private_key(
+        public_exponent=65537,
+        key_size=key_size,
+        backend=default_backend()
+    )
+
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+
+    public_key = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.OpenSSH,
+        format=serialization.PublicFormat.OpenSSH
+    )
+
+    return private_pem, public_key
+
+def _fill_rsa_key_pool():
+    """Keep the RSA keypair pool topped up; put() blocks while it is full."""
+    while True:
+        _RSA_KEY_POOL.put(_generate_rsa_keypair())
+
+def _ensure_rsa_pool_running():
+    with _RSA_POOL_LOCK:
+        while len(_RSA_POOL_THREADS) < RSA_POOL_REFILL_WORKERS:
+            thread = threading.Thread(target=_fill_rsa_key_pool, daemon=True)
+            thread.start()
+            _RSA_POOL_THREADS.append(thread)
 
 class GitHubKeyManager:
     def __init__(self, logger):
         self.logger = logger
         self.github_token = self._get_github_token()
-        self.github_client = github.Github(self.github_token)
+        # per_page=100 keeps pagination round-trips low, pool_size keeps
+        # HTTPS connections to api.github.com alive between reconciliations,
+        # and the retry policy absorbs transient GitHub 5xx responses.
+        self.github_client = github.Github(
+            self.github_token,
+            per_page=100,
+            pool_size=20,
+            retry=urllib3.Retry(total=3, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504])
+        )
+        self._keys_cache = {}  # repo url -> (expires_at, list of raw key dicts)
+        self._repo_cache = {}  # repo full name -> lazy Repository handle
 
-    def _get_github_token(self):
-        """Retrieve GitHub token from secret."""
+    def _detect_namespace(self):
+        """Determine the namespace the operator is running in."""
         current_namespace = "operators"  # Set default namespace
-        
+
+        self.logger.info("Running in-cluster, attempting to determine current namespace...")
         try:
-            self.logger.info("Running in-cluster, attempting to determine current namespace...")
-            try:
-                namespace_file = "/var/run/secrets/kubernetes.io/serviceaccount/namespace"
-                self.logger.debug(f"Reading namespace from {namespace_file}")
-                with open(namespace_file, "r") as f:
-                    ns = f.read().strip()
-                    if ns:  # Only use the namespace if we got a non-empty value
-                        current_namespace = ns
-                        self.logger.info(f"Successfully determined current namespace: {current_namespace}")
-                    else:
-                        self.logger.warning("Empty namespace found in service account token, using default 'operators'")
-            except (FileNotFoundError, PermissionError) as e:
-                self.logger.warning(
-                    f"Could not read namespace from service account token ({str(e)}). "
-                    "Falling back to default namespace 'operators'"
-                )
-            
-            self.logger.info(f"Attempting to read 'github-token' secret from namespace '{current_namespace}'")
+            namespace_file = "/var/run/secrets/kubernetes.io/serviceaccount/namespace"
+            self.logger.debug("Reading namespace from %s", namespace_file)
+            with open(namespace_file, "r") as f:
+                ns = f.read().strip()
+                if ns:  # Only use the namespace if we got a non-empty value
+                    current_namespace = ns
+                    self.logger.info(f"Successfully determined current namespace: {current_namespace}")
+                else:
+                    self.logger.warning("Empty namespace found in service account token, using default 'operators'")
+        except (FileNotFoundError, PermissionError) as e:
+            self.logger.warning(
+                f"Could not read namespace from service account token ({str(e)}). "
+                "Falling back to default namespace 'operators'"
+            )
+
+        return current_namespace
+
+    def _get_github_token(self):
+        """Retrieve GitHub token from secret, using the process-wide TTL cache."""
+        global CURRENT_NAMESPACE
+        if CURRENT_NAMESPACE is None:
+            CURRENT_NAMESPACE = self._detect_namespace()
+        current_namespace = CURRENT_NAMESPACE
+
+        cached = _TOKEN_CACHE.get(current_namespace)
+        if cached is not None and time.monotonic() < cached[0]:
+            return cached[1]
+
+        try:
+            self.logger.debug("Reading 'github-token' secret from namespace '%s'", current_namespace)
             try:
-                secret = core_v1_api.read_namespaced_secret(
+                secret = _core_v1().read_namespaced_secret(
                     name='github-token',
                     namespace=current_namespace
                 )
@@ -62,7 +191,9 @@ class GitHubKeyManager:
 
             try:
                 token = base64.b64decode(secret.data['GITHUB_TOKEN']).decode()
-                self.logger.info(f"Successfully retrieved GitHub token (starts with: {token[:4]}...)")
+                self.logger.debug("Retrieved GitHub token from secret")
+                # Only successful lookups are cached; failures keep retrying.
+                _TOKEN_CACHE[current_namespace] = (time.monotonic() + TOKEN_CACHE_TTL, token)
                 return token
             except KeyError:
                 self.logger.error(
@@ -90,155 +221,350 @@ class GitHubKeyManager:
             raise kopf.PermanentError(f"Unexpected error getting GitHub token: {e}")
 
     def get_repository(self, repo_name):
-        """Get GitHub repository instance."""
-        try:
-            repo = self.github_client.get_repo(repo_name)
-            self.logger.info(f"Got repository {repo_name}")
-            return repo
-        except github.GithubException as e:
-            raise kopf.PermanentError(f"Failed to get repository: {e}")
-
-    def generate_ssh_key(self):
-        """Generate SSH key pair."""
-        private_key = rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=4096,
-            backend=default_backend()
-        )
-        
-        private_pem = private_key.private_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.PKCS8,
-            encryption_algorithm=serialization.NoEncryption()
-        )
-        
-        public_key = private_key.public_key().public_bytes(
-            encoding=serialization.Encoding.OpenSSH,
-            format=serialization.PublicFormat.OpenSSH
-        )
-        
-        return private_pem.decode(), public_key.decode()
+        """Get GitHub repository instance.
+
+        The handle is lazy: no metadata GET happens here, because the
+        operator only ever calls key endpoints on it. A bad repository
+        name surfaces as a GithubException on the first real call.
+        """
+        repo = self._repo_cache.get(repo_name)
+        if repo is None:
+            repo = self.github_client.get_repo(repo_name, lazy=True)
+            self._repo_cache[repo_name] = repo
+        self.logger.debug("Using repository %s", repo_name)
+        return repo
+
+    def generate_ssh_key(self, key_type='ed25519'):
+        """Generate SSH key pair of the requested type, as bytes.
+
+        Ed25519 is the default: GitHub fully supports it for deploy keys
+        and generating one takes microseconds, while RSA-4096 generation
+        blocks the handler for seconds of prime search. The serialized
+        keys stay bytes so they can be base64-encoded without another
+        str round-trip.
+        """
+        if key_type == 'ed25519':
+            private_key = ed25519.Ed25519PrivateKey.generate()
+
+            private_pem = private_key.private_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PrivateFormat.OpenSSH,
+                encryption_algorithm=serialization.NoEncryption()
+            )
+
+            public_key = private_key.public_key().public_bytes(
+                encoding=serialization.Encoding.OpenSSH,
+                format=serialization.PublicFormat.OpenSSH
+            )
+
+            return private_pem, public_key
+
+        if key_type == 'rsa4096':
+            _ensure_rsa_pool_running()
+            try:
+                return _RSA_KEY_POOL.get(timeout=30)
+            except queue.Empty:
+                self.logger.warning("RSA key pool exhausted, generating a keypair synchronously")
+                return _generate_rsa_keypair()
+
+        if key_type == 'rsa3072':
+            # NIST rates 3072-bit RSA at 128-bit security; generation is a
+            # few times faster than 4096, so no pre-generation pool is kept.
+            return _generate_rsa_keypair(3072)
+
+        raise kopf.PermanentError(f"Unsupported keyType '{key_type}', expected 'ed25519', 'rsa3072' or 'rsa4096'")
 
     def verify_key_exists(self, repo, key_id):
         """Verify GitHub deploy key exists."""
         try:
             repo.get_key(key_id)
-            self.logger.info(f"Verified deploy key {key_id} exists in GitHub")
+            self.logger.debug("Verified deploy key %s exists in GitHub", key_id)
             return True
         except github.GithubException as e:
             self.logger.error(f"Failed to verify deploy key {key_id}: {e}")
             return False
 
     def delete_key_by_id(self, repo, key_id):
-        """Delete a specific GitHub deploy key by ID."""
+        """Delete a specific GitHub deploy key by ID.
+
+        The DELETE response is authoritative (204 on success, 404 when the
+        key is already gone), so no GET is issued before or after it.
+        """
+        return self._raw_delete_key(repo, key_id)
+
+    @staticmethod
+    def _next_page_url(headers):
+        """Extract the rel="next" URL from a Link response header, if any."""
+        for part in (headers.get('link') or '').split(','):
+            if 'rel="next"' in part:
+                return part[part.index('<') + 1:part.index('>')]
+        return None
+
+    def _iter_keys_raw(self, repo):
+        """Yield the repo's deploy keys as plain dicts, one page at a time.
+
+        The raw listing returns complete JSON objects, so consumers read
+        fields with plain dict access instead of PyGithub's lazy
+        attributes, which can issue a completion GET per key when the
+        list response was only partially populated.
+        """
+        url = f"{repo.url}/keys?per_page=100"
+        while url:
+            headers, data = repo._requester.requestJsonAndCheck("GET", url)
+            yield from data
+            url = self._next_page_url(headers)
+
+    def list_keys_cached(self, repo):
+        """List the repo's deploy keys as raw dicts, shared for KEY_LIST_TTL."""
+        now = time.monotonic()
+        cached = self._keys_cache.get(repo.url)
+        if cached is not None and now < cached[0]:
+            return cached[1]
+
+        keys = list(self._iter_keys_raw(repo))
+        self._keys_cache[repo.url] = (now + KEY_LIST_TTL, keys)
+        return keys
+
+    def _invalidate_keys_cache(self, repo):
+        self._keys_cache.pop(repo.url, None)
+
+    def _raw_delete_key(self, repo, key_id):
+        """Delete a deploy key with a single DELETE call, skipping the read-back.
+
+        A 401 is re-raised rather than folded into the False return: the
+        handlers invalidate the token cache and retry on it, and treating
+        it as an ordinary failure would let a delete "succeed" with the
+        key still registered. Pooled callers see it via future.result().
+        """
         try:
-            key = repo.get_key(key_id)
-            key.delete()
-            self.logger.info(f"Successfully deleted deploy key {key_id}")
+            repo._requester.requestJsonAndCheck("DELETE", f"{repo.url}/keys/{key_id}")
+            self.logger.info("Deleted deploy key %s", key_id)
+            self._invalidate_keys_cache(repo)
             return True
+        except github.BadCredentialsException:
+            raise
         except github.GithubException as e:
             if e.status == 404:
-                self.logger.info(f"Deploy key {key_id} was already deleted")
+                self.logger.debug("Deploy key %s was already deleted", key_id)
                 return True
             self.logger.error(f"Error deleting deploy key {key_id}: {e}")
             return False
+        except Exception as e:
+            # Deletions fan out on the shared pool; one failed request
+            # (e.g. a connection error) must not abort its siblings.
+            self.logger.error(f"Unexpected error deleting deploy key {key_id}: {e}")
+            return False
+
+    def get_key_conditional(self, repo, key_id, etag=None):
+        """Fetch a deploy key, honoring a previously seen ETag.
+
+        Returns (key_data, etag): key_data is the raw key dict, or None
+        when the key is unchanged since the given ETag. Conditional 304
+        responses do not count against the GitHub rate limit. A missing
+        key raises GithubException with status 404 as before.
+        """
+        headers = {'If-None-Match': etag} if etag else None
+        try:
+            response_headers, data = repo._requester.requestJsonAndCheck(
+                "GET", f"{repo.url}/keys/{key_id}", headers=headers
+            )
+        except github.GithubException as e:
+            if e.status == 304:
+                return None, etag
+            raise
+
+        if not data:
+            # Some transport paths surface 304 as an empty body instead.
+            return None, etag
+        return data, response_headers.get('etag')
 
     def delete_keys_by_title(self, repo, title):
-        """Delete all GitHub deploy keys with a specific title."""
-        keys = list(repo.get_keys())
-        self.logger.info(f"Found {len(keys)} existing deploy keys")
-        
-        keys_deleted = 0
-        for key in keys:
-            if key.title == title:
-                self.logger.info(f"Found deploy key with title '{title}' (id: {key.id}), deleting it")
-                if self.delete_key_by_id(repo, key.id):
-                    keys_deleted += 1
-        
+        """Delete all operator-managed GitHub deploy keys for a base title.
+
+        The title is the base title from the CR spec; the comparison adds
+        the managed prefix, mirroring what create_key registers.
+
+        The paginated listing is streamed rather than materialized, so
+        matches start deleting on the shared pool while later pages are
+        still being fetched, and peak memory stays one page. The common
+        single-match case therefore costs one list page plus one DELETE.
+        """
+        now = time.monotonic()
+        cached = self._keys_cache.get(repo.url)
+        if cached is not None and now < cached[0]:
+            keys_iter = cached[1]
+        else:
+            keys_iter = self._iter_keys_raw(repo)  # pages lazily
+
+        managed_title = f"{_MANAGED_PREFIX}{title}"
+        futures = []
+        scanned = 0
+        for key in keys_iter:
+            scanned += 1
+            if key['title'] == managed_title:
+                self.logger.info("Found deploy key with title '%s' (id: %s), deleting it", managed_title, key['id'])
+                futures.append(_DELETE_POOL.submit(self._raw_delete_key, repo, key['id']))
+
+        keys_deleted = sum(1 for future in futures if future.result())
+        self.logger.debug("Scanned %s deploy keys, deleted %s", scanned, keys_deleted)
         return keys_deleted
 
     def create_key(self, repo, title, key, read_only):
         """Create a new GitHub deploy key."""
         try:
-            managed_title = f"k8s-operator:{title}"
-            return repo.create_key(managed_title, key, read_only)
+            if isinstance(key, bytes):
+                # The GitHub API payload needs the OpenSSH text form.
+                key = key.decode('ascii')
+
+            # Validate locally first: a malformed key would otherwise only
+            # surface as a 422 after a full round-trip to GitHub.
+            try:
+                serialization.load_ssh_public_key(key.encode())
+            except (ValueError, UnsupportedAlgorithm) as e:
+                raise kopf.PermanentError(f"Malformed SSH public key: {e}")
+
+            managed_title = f"{_MANAGED_PREFIX}{title}"
+            created = repo.create_key(managed_title, key, read_only)
+            self._invalidate_keys_cache(repo)
+            return created
         except github.GithubException as e:
             self.logger.error(f"Error creating key: {str(e)}")
             raise
 
     def is_operator_managed_key(self, key_title):
         """Check if a key was created by this operator"""
-        return key_title.startswith("k8s-operator:")
+        return key_title.startswith(_MANAGED_PREFIX)
 
     def get_key_base_title(self, key_title):
         """Get the original title without the operator prefix"""
         if self.is_operator_managed_key(key_title):
-            return key_title.split(":", 1)[1]
+            # Slicing off the prefix is allocation-free and, unlike a
+            # split on ':', safe for titles that themselves contain one.
+            return key_title[len(_MANAGED_PREFIX):]
         return key_title
 
+# Building a GitHubKeyManager is expensive (Secret read against the K8s API
+# plus a fresh HTTPS session to GitHub), so share one instance per process
+# instead of rebuilding it in every handler invocation.
+_GH_MANAGER = None
+
+def get_manager(logger):
+    """Return the process-wide GitHubKeyManager, creating it on first use.
+
+    The manager (and with it the warm HTTPS session to GitHub) is only
+    rebuilt when the token actually rotates; in the steady state the
+    token check below is a cache hit and costs nothing.
+    """
+    global _GH_MANAGER
+    if _GH_MANAGER is None:
+        _GH_MANAGER = GitHubKeyManager(logger)
+    else:
+        # Keep log lines attributed to the handler that is currently running.
+        _GH_MANAGER.logger = logger
+        if _GH_MANAGER._get_github_token() != _GH_MANAGER.github_token:
+            logger.info("GitHub token rotated, rebuilding the GitHub client")
+            _GH_MANAGER = GitHubKeyManager(logger)
+    return _GH_MANAGER
+
+def _manager_and_repo(spec, logger):
+    """Single code path from a CR spec to (manager, repository handle).
+
+    Every handler resolves its repository through this, so the token,
+    client and handle caches apply uniformly; in the steady state it is
+    a pair of dictionary lookups.
+    """
+    manager = get_manager(logger)
+    return manager, manager.get_repository(spec['repository'])
+
 class KubernetesSecretManager:
+    """Writes deploy-key Secrets, delegating base64 encoding to the apiserver."""
+
     def __init__(self, logger):
         self.logger = logger
 
     def create_or_update_secret(self, name, namespace, private_key, public_key, owner_reference):
-        """Create or update Kubernetes secret with SSH keys."""
-        # Add github.com to known_hosts
-        known_hosts = "github.com ecdsa-sha2-nistp256 AAAAE2VjZHNhLXNoYTItbmlzdHAyNTYAAAAIbmlzdHAyNTYAAABBBEmKSENjQEezOmxkZMy7opKgwFB9nkt5YRrYMjNuG5N87uRgg6CLrbo5wAdT/y6v0mKV0U2w0WZ2YB/++Tpockg="
-        
-        secret_data = {
-            'identity': private_key,
-            'identity.pub': public_key,
-            'known_hosts': known_hosts
+        """Create or update Kubernetes secret with SSH keys (given as bytes)."""
+        # stringData shifts the base64 encoding to the apiserver; the key
+        # material is plain ASCII (PEM / OpenSSH text) already.
+        string_data = {
+            'identity': private_key.decode('ascii'),
+            'identity.pub': public_key.decode('ascii'),
+            'known_hosts': KNOWN_HOSTS
         }
-        
-        encoded_data = {k: base64.b64encode(v.encode()).decode() for k, v in secret_data.items()}
-        
-        try:
-            # Try to update existing secret
-            secret = core_v1_api.read_namespaced_secret(name=name, namespace=namespace)
-            secret.data = encoded_data
-            core_v1_api.replace_namespaced_secret(
-                name=name,
-                namespace=namespace,
-                body=secret
-            )
-            self.logger.info(f"Updated existing secret {name}")
-        except kubernetes.client.exceptions.ApiException as e:
-            if e.status != 404:
-                raise
-            
-            core_v1_api.create_namespaced_secret(
-                namespace=namespace,
-                body=kubernetes.client.V1Secret(
-                    metadata=kubernetes.client.V1ObjectMeta(
-                        name=name,
-                        owner_references=[owner_reference]
-                    ),
-                    type='Opaque',
-                    data=encoded_data
-                )
-            )
-            self.logger.info(f"Created new secret {name}")
 
-    def delete_secret_if_exists(self, name, namespace):
-        """Delete a Kubernetes secret if it exists."""
+        # Server-side apply creates or updates in a single call, and when the
+        # applied fields are unchanged the apiserver skips the etcd write
+        # entirely, so re-running the create path is a cheap no-op.
+        desired = {
+            'apiVersion': 'v1',
+            'kind': 'Secret',
+            'metadata': {
+                'name': name,
+                'namespace': namespace,
+                'ownerReferences': [_api_client().sanitize_for_serialization(owner_reference)]
+            },
+            'type': 'Opaque',
+            'stringData': string_data
+        }
         try:
-            core_v1_api.delete_namespaced_secret(name=name, namespace=namespace)
-            self.logger.info(f"Deleted existing secret {name}")
-            return True
+            self._apply_secret(name, namespace, desired)
         except kubernetes.client.exceptions.ApiException as e:
-            if e.status != 404:
+            if e.status != 415:
                 raise
-            return False
+            # Apiserver without server-side apply; fall back to the
+            # merge-patch + create-on-404 flow.
+            self.logger.warning("Server-side apply unsupported, falling back to patch/create")
+            try:
+                _core_v1().patch_namespaced_secret(name=name, namespace=namespace, body=desired)
+            except kubernetes.client.exceptions.ApiException as e:
+                if e.status != 404:
+                    raise
+                _core_v1().create_namespaced_secret(namespace=namespace, body=desired)
+        self.logger.info("Applied secret %s", name)
+
+    @staticmethod
+    def _apply_secret(name, namespace, desired):
+        """Server-side apply a Secret manifest.
+
+        The generated patch_namespaced_secret cannot send the apply-patch
+        content type, so the PATCH goes through call_api with the header
+        set explicitly (the apiserver accepts JSON bodies for it).
+        """
+        _api_client().call_api(
+            '/api/v1/namespaces/{namespace}/secrets/{name}',
+            'PATCH',
+            path_params={'namespace': namespace, 'name': name},
+            query_params=[('fieldManager', 'github-deploy-key-operator'), ('force', 'true')],
+            header_params={
+                'Content-Type': 'application/apply-patch+yaml',
+                'Accept': 'application/json',
+            },
+            body=desired,
+            response_type='V1Secret',
+            auth_settings=['BearerToken'],
+            _return_http_data_only=True,
+        )
+
+@kopf.on.startup()
+def warm_kubernetes_clients(logger, **kwargs):
+    """Build the Kubernetes clients before the first event arrives.
+
+    The clients are created lazily so importing this module never needs a
+    cluster config; warming them here moves the in-cluster config load and
+    TLS setup out of the first handler's latency.
+    """
+    _api_client()
+    logger.debug("Kubernetes API client initialized")
 
 @kopf.on.create('github.com', 'v1alpha1', 'githubdeploykeys')
 def create_deploy_key(spec, logger, patch, **kwargs):
-    github_manager = GitHubKeyManager(logger)
     secret_manager = KubernetesSecretManager(logger)
-    
+    # Set once the GitHub key exists, so the error path knows exactly
+    # what needs rolling back.
+    created_key = None
+
     try:
-        # Get repository
-        repo = github_manager.get_repository(spec['repository'])
+        github_manager, repo = _manager_and_repo(spec, logger)
         
         #Extract readOnly setting
         read_only = spec.get('readOnly', True)
@@ -248,13 +574,17 @@ def create_deploy_key(spec, logger, patch, **kwargs):
         github_manager.delete_keys_by_title(repo, title)
         
         # Generate and create new key
-        private_key, public_key = github_manager.generate_ssh_key()
-        key = github_manager.create_key(repo, title, public_key, read_only)
+        private_key, public_key = github_manager.generate_ssh_key(spec.get('keyType', 'ed25519'))
+        created_key = github_manager.create_key(repo, title, public_key, read_only)
+        key = created_key
         logger.info(f"Created new deploy key: {key.id}")
         
-        if not github_manager.verify_key_exists(repo, key.id):
-            raise kopf.PermanentError("Failed to verify deploy key")
-        
+        # The 201 from key creation is authoritative, so the read-back is
+        # opt-in for users who want an audit-style double check.
+        if spec.get('verifyAfterCreate', False):
+            if not github_manager.verify_key_exists(repo, key.id):
+                raise kopf.PermanentError("Failed to verify deploy key")
+
         # Update status
         patch['status'] = {'keyId': key.id}
         
@@ -267,7 +597,6 @@ def create_deploy_key(spec, logger, patch, **kwargs):
             uid=kwargs['body']['metadata']['uid']
         )
         
-        secret_manager.delete_secret_if_exists(secret_name, kwargs['meta']['namespace'])
         secret_manager.create_or_update_secret(
             secret_name,
             kwargs['meta']['namespace'],
@@ -278,33 +607,77 @@ def create_deploy_key(spec, logger, patch, **kwargs):
         
         logger.info(f"Successfully created deploy key {key.id} and secret {secret_name}")
         
+    except github.BadCredentialsException as e:
+        # The cached token went stale (e.g. rotated); refresh and retry.
+        logger.error("GitHub rejected the cached token, refreshing it")
+        invalidate_github_token()
+        raise kopf.TemporaryError(f"GitHub credentials rejected: {e}", delay=30)
     except Exception as e:
         logger.error(f"Error creating deploy key: {str(e)}")
-        # Clean up if key was created
-        try:
-            if 'key' in locals():
-                key.delete()
-                logger.info(f"Cleaned up deploy key {key.id} after error")
-        except Exception as cleanup_error:
-            logger.error(f"Error during cleanup: {str(cleanup_error)}")
+        if created_key is not None:
+            # Roll back the orphaned GitHub key on the shared pool; the
+            # handler returns its error to kopf without waiting on the
+            # extra round-trip, and _raw_delete_key logs its own outcome.
+            _DELETE_POOL.submit(github_manager._raw_delete_key, repo, created_key.id)
         raise kopf.PermanentError(str(e))
 
 @kopf.on.update('github.com', 'v1alpha1', 'githubdeploykeys')
 def update_deploy_key(spec, status, logger, patch, old, **kwargs):
-    if (old['spec'].get('title', 'Kubernetes-managed deploy key') == spec.get('title', 'Kubernetes-managed deploy key') and
-        old['spec'].get('readOnly', True) == spec.get('readOnly', True)):
+    old_title = old['spec'].get('title', 'Kubernetes-managed deploy key')
+    new_title = spec.get('title', 'Kubernetes-managed deploy key')
+    metadata_changed = (old_title != new_title or
+                        old['spec'].get('readOnly', True) != spec.get('readOnly', True))
+    key_type_changed = old['spec'].get('keyType', 'ed25519') != spec.get('keyType', 'ed25519')
+
+    if not metadata_changed and not key_type_changed:
         logger.info("No relevant changes detected, skipping update")
         return
-    
-    logger.info("Detected changes in title or readOnly, recreating deploy key")
-    create_deploy_key(spec, logger, patch, **kwargs)
+
+    if key_type_changed:
+        logger.info("Detected change in keyType, recreating deploy key")
+        create_deploy_key(spec, logger, patch, **kwargs)
+        return
+
+    # Title and readOnly are GitHub-side metadata; re-registering the
+    # existing public key avoids regenerating the keypair and rewriting
+    # the Secret just for a metadata tweak.
+    logger.info("Detected changes in title or readOnly, re-registering existing key")
+    secret_name = f"{kwargs['meta']['name']}-private-key"
+    namespace = kwargs['meta']['namespace']
+
+    try:
+        secret = _core_v1().read_namespaced_secret(name=secret_name, namespace=namespace)
+        existing_public_key = base64.b64decode(secret.data['identity.pub']).decode()
+    except (KeyError, kubernetes.client.exceptions.ApiException) as e:
+        logger.info(f"Existing key material unavailable ({e}), recreating deploy key")
+        create_deploy_key(spec, logger, patch, **kwargs)
+        return
+
+    try:
+        github_manager, repo = _manager_and_repo(spec, logger)
+        key_id = status.get('keyId') if status else None
+        if key_id:
+            github_manager.delete_key_by_id(repo, key_id)
+        else:
+            github_manager.delete_keys_by_title(repo, old_title)
+
+        key = github_manager.create_key(repo, new_title, existing_public_key, spec.get('readOnly', True))
+        patch['status'] = {'keyId': key.id}
+        logger.info(f"Re-registered deploy key as {key.id} without rotating the keypair")
+    except github.BadCredentialsException as e:
+        logger.error("GitHub rejected the cached token, refreshing it")
+        invalidate_github_token()
+        raise kopf.TemporaryError(f"GitHub credentials rejected: {e}", delay=30)
+    except Exception as e:
+        logger.error(f"Error updating deploy key: {str(e)}")
+        raise kopf.PermanentError(str(e))
 
 @kopf.on.delete('github.com', 'v1alpha1', 'githubdeploykeys')
 def delete_deploy_key(spec, meta, status, logger, **kwargs):
-    github_manager = GitHubKeyManager(logger)
-    
+    _RECONCILE_TICKS.pop((meta['namespace'], meta['name']), None)
+
     try:
-        repo = github_manager.get_repository(spec['repository'])
+        github_manager, repo = _manager_and_repo(spec, logger)
         
         # Delete by key ID if available
         key_id = status.get('keyId') if status else None
@@ -319,65 +692,216 @@ def delete_deploy_key(spec, meta, status, logger, **kwargs):
             keys_deleted = github_manager.delete_keys_by_title(repo, title)
             logger.info(f"Deleted {keys_deleted} deploy key(s) with title '{title}'")
         
+    except github.BadCredentialsException as e:
+        logger.error("GitHub rejected the cached token, refreshing it")
+        invalidate_github_token()
+        raise kopf.TemporaryError(f"GitHub credentials rejected: {e}", delay=30)
     except github.GithubException as e:
         if e.status != 404:  # Ignore if repo not found
             raise kopf.PermanentError(f"Failed to delete deploy key: {e}")
-    
+
     logger.info(f"Secret {meta['name']}-private-key will be deleted by garbage collection")
 
-@kopf.timer('github.com', 'v1alpha1', 'githubdeploykeys', interval=60.0)
+# Deploy-key Secrets seen on kopf's watch stream. Reconciliation checks
+# Secret existence with a set lookup instead of a per-tick API-server GET.
+KNOWN_SECRETS = set()  # (namespace, name)
+
+@kopf.on.event('', 'v1', 'secrets')
+def track_deploy_key_secrets(event, namespace, name, logger, **kwargs):
+    """Maintain the in-memory index of deploy-key Secrets.
+
+    The same stream carries the github-token Secret, which keeps the
+    token cache warm push-style: rotation lands in the cache the moment
+    the Secret changes, and the steady state needs no polling GETs.
+    """
+    if name == 'github-token':
+        _refresh_token_from_event(event, namespace, logger)
+        return
+
+    if not name.endswith('-private-key'):
+        return
+
+    if event['type'] == 'DELETED':
+        KNOWN_SECRETS.discard((namespace, name))
+        _repair_owner_deploy_key(event.get('object') or {}, namespace, name, logger)
+    else:
+        KNOWN_SECRETS.add((namespace, name))
+
+def _refresh_token_from_event(event, namespace, logger):
+    """Sync the token cache with a github-token Secret watch event."""
+    if event['type'] == 'DELETED':
+        _TOKEN_CACHE.pop(namespace, None)
+        return
+
+    data = (event.get('object') or {}).get('data') or {}
+    encoded = data.get('GITHUB_TOKEN')
+    if not encoded:
+        return
+
+    try:
+        token = base64.b64decode(encoded).decode()
+    except Exception as e:
+        logger.error(f"Could not decode GITHUB_TOKEN from secret in {namespace}: {e}")
+        return
+
+    # The TTL only guards against missed watch events; updates normally
+    # arrive here long before any expiry.
+    _TOKEN_CACHE[namespace] = (time.monotonic() + TOKEN_CACHE_TTL, token)
+    logger.debug("Refreshed GitHub token cache from secret in %s", namespace)
+
+def _repair_owner_deploy_key(secret_obj, namespace, name, logger):
+    """Recreate a deploy key right away when its Secret gets deleted.
+
+    The deletion event arrives on the watch stream, so reacting here keeps
+    recovery time low even though the safety-net timer runs rarely.
+    """
+    owners = secret_obj.get('metadata', {}).get('ownerReferences') or []
+    for owner in owners:
+        if owner.get('kind') != 'GitHubDeployKey':
+            continue
+
+        try:
+            body = _custom_objects().get_namespaced_custom_object(
+                'github.com', 'v1alpha1', namespace, 'githubdeploykeys', owner['name']
+            )
+        except kubernetes.client.exceptions.ApiException as e:
+            if e.status == 404:
+                # The CR is gone too; nothing to repair.
+                return
+            logger.error(f"Error fetching GitHubDeployKey {owner['name']}: {e}")
+            return
+
+        if body['metadata'].get('deletionTimestamp'):
+            # The CR is terminating; this Secret deletion is the garbage
+            # collector at work, not drift. Recreating here would re-add
+            # the GitHub key that delete_deploy_key just removed.
+            logger.debug("GitHubDeployKey %s is being deleted, skipping repair", owner['name'])
+            return
+
+        logger.info(f"Secret {name} was deleted, recreating deploy key for {owner['name']}")
+        patch = {}
+        try:
+            create_deploy_key(body['spec'], logger, patch, meta=body['metadata'], body=body)
+        except Exception as e:
+            logger.error(f"Error recreating deploy key for {owner['name']}: {e}")
+            return
+
+        if patch.get('status'):
+            _custom_objects().patch_namespaced_custom_object_status(
+                'github.com', 'v1alpha1', namespace, 'githubdeploykeys', owner['name'],
+                {'status': patch['status']}
+            )
+
+# Listing every deploy key on the repo each tick burns GitHub rate-limit
+# budget proportional to key count x CR count. When a CR's key is known by
+# ID, the stale-key sweep only needs to run occasionally as a safety net.
+SWEEP_EVERY_N_TICKS = 10
+_RECONCILE_TICKS = {}  # (namespace, name) -> tick counter
+
+# Secret deletions are already repaired instantly from the watch stream, so
+# the timer only catches GitHub-side drift; fleets near the rate limit can
+# stretch it further via the env var.
+RECONCILE_INTERVAL = float(os.environ.get('RECONCILE_INTERVAL', '600'))
+
+@kopf.timer('github.com', 'v1alpha1', 'githubdeploykeys', interval=RECONCILE_INTERVAL, idle=300)
 def reconcile_deploy_key(spec, status, logger, patch, **kwargs):
-    """Periodically reconcile the deploy key to ensure it exists."""
-    github_manager = GitHubKeyManager(logger)
-    
+    """Periodically reconcile the deploy key to ensure it exists.
+
+    Secret deletions are repaired immediately via the watch stream above,
+    so this timer is only a coarse safety net against GitHub-side drift.
+    """
     try:
-        repo = github_manager.get_repository(spec['repository'])
+        github_manager, repo = _manager_and_repo(spec, logger)
         key_id = status.get('keyId') if status else None
         base_title = spec.get('title', 'Kubernetes-managed deploy key')
-        managed_title = f"k8s-operator:{base_title}"
-        
-        # Clean up any operator-managed keys that don't match our key_id
-        for key in repo.get_keys():
-            if github_manager.is_operator_managed_key(key.title) and (not key_id or key.id != key_id):
-                logger.info(f"Found stale operator-managed deploy key {key.id}, deleting")
-                github_manager.delete_key_by_id(repo, key.id)
-        
+        managed_title = f"{_MANAGED_PREFIX}{base_title}"
+
+        cr_key = (kwargs['meta']['namespace'], kwargs['meta']['name'])
+        tick = _RECONCILE_TICKS.get(cr_key, 0)
+        _RECONCILE_TICKS[cr_key] = tick + 1
+
+        def sweep(keys):
+            # Clean up any operator-managed keys that don't match our
+            # key_id. The listing yields raw dicts, so no per-key GETs.
+            for key in keys:
+                title = key.get('title', '')
+                stale_id = key.get('id')
+                if title.startswith(_MANAGED_PREFIX) and (not key_id or stale_id != key_id):
+                    logger.info(f"Found stale operator-managed deploy key {stale_id}, deleting")
+                    github_manager.delete_key_by_id(repo, stale_id)
+
         if not key_id:
+            # Sweep before recreating so the fresh key is not mistaken
+            # for leftover drift.
+            sweep(github_manager.list_keys_cached(repo))
             logger.info("No key ID in status, recreating deploy key")
             create_deploy_key(spec, logger, patch, **kwargs)
             return
-            
-        # Check if our key still exists
+
+        # With a known key ID the sweep is only drift cleanup, so the
+        # O(keys) listing runs every Nth tick instead of every time. The
+        # listing and the single-key GET below are independent GitHub
+        # requests, so on sweep ticks the listing is started on the shared
+        # pool and the two round-trips overlap.
+        keys_future = None
+        if tick % SWEEP_EVERY_N_TICKS == 0:
+            keys_future = _DELETE_POOL.submit(github_manager.list_keys_cached, repo)
+
+        recreated = False
+
+        # Check if our key still exists. The ETag from the previous tick
+        # turns the steady-state check into a rate-limit-free 304.
+        key_etag = status.get('keyEtag') if status else None
         try:
-            key = repo.get_key(key_id)
-            if key.title != managed_title:
+            key_data, new_etag = github_manager.get_key_conditional(repo, key_id, key_etag)
+            if key_data is None:
+                logger.debug("Deploy key %s unchanged since last check", key_id)
+            elif key_data.get('title') != managed_title:
                 logger.info(f"Deploy key {key_id} exists but title has changed, recreating")
                 # Delete old key before creating new one
                 github_manager.delete_key_by_id(repo, key_id)
                 create_deploy_key(spec, logger, patch, **kwargs)
+                recreated = True
             else:
-                logger.info(f"Deploy key {key_id} exists and is correctly configured")
+                logger.debug("Deploy key %s exists and is correctly configured", key_id)
+                if new_etag and new_etag != key_etag:
+                    patch['status'] = {'keyEtag': new_etag}
+        except github.BadCredentialsException:
+            # Let the outer handler invalidate the cached token; swallowing
+            # a 401 here would leave the stale token in place for its TTL.
+            raise
         except github.GithubException as e:
             if e.status == 404:
                 logger.info(f"Deploy key {key_id} no longer exists, recreating")
                 create_deploy_key(spec, logger, patch, **kwargs)
+                recreated = True
             else:
                 logger.error(f"Error checking deploy key {key_id}: {e}")
-                
-        # Verify secret exists
-        secret_name = f"{kwargs['meta']['name']}-private-key"
-        try:
-            core_v1_api.read_namespaced_secret(
-                name=secret_name,
-                namespace=kwargs['meta']['namespace']
-            )
-            logger.info(f"Secret {secret_name} exists")
-        except kubernetes.client.exceptions.ApiException as e:
-            if e.status == 404:
-                logger.info(f"Secret {secret_name} is missing, recreating deploy key")
-                create_deploy_key(spec, logger, patch, **kwargs)
+
+        if keys_future is not None:
+            if recreated:
+                # The replacement key's ID is not in status yet, so a sweep
+                # now would delete it; the next sweep tick handles drift.
+                keys_future.result()
             else:
-                logger.error(f"Error checking secret {secret_name}: {e}")
-                
+                sweep(keys_future.result())
+
+        if recreated:
+            # create_deploy_key just rewrote the Secret; the watch event
+            # updating KNOWN_SECRETS may not have arrived yet.
+            return
+
+        # Verify secret exists (fed by the Secret watch stream, no API GET)
+        secret_name = f"{kwargs['meta']['name']}-private-key"
+        if (kwargs['meta']['namespace'], secret_name) in KNOWN_SECRETS:
+            logger.debug("Secret %s exists", secret_name)
+        else:
+            logger.info(f"Secret {secret_name} is missing, recreating deploy key")
+            create_deploy_key(spec, logger, patch, **kwargs)
+
+    except github.BadCredentialsException:
+        # Refresh the token; the next tick retries with fresh credentials.
+        logger.error("GitHub rejected the cached token, refreshing it")
+        invalidate_github_token()
     except Exception as e:
         logger.error(f"Error during reconciliation: {str(e)}")
\ No newline at end of file